@@ -2,20 +2,15 @@ import webview
 import json
 import traceback
 import os
-from flask import Flask, request, render_template, send_from_directory
-import logging
+import mmap
+try:
+    import orjson # Optional: much faster project save/load for large trees
+except ImportError:
+    orjson = None
 
 # Import core logic from other modules
-from project_generator import generate_html, generate_lua_script
-from html_parser import parse_html_to_project
-
-# --- Suppress Flask's default startup messages for a cleaner console ---
-log = logging.getLogger('werkzeug')
-log.setLevel(logging.ERROR)
-
-# --- Flask App Setup ---
-# The 'frontend' directory will serve our static HTML, CSS, and JS files.
-app = Flask(__name__, static_folder='frontend', static_url_path='')
+from project_generator import write_html, generate_lua_script
+# html_parser (lxml + cssutils) is imported on first use in Api.import_html
 
 class Api:
     """
@@ -35,9 +30,18 @@ class Api:
             if file_path:
                 # Ensure file_path is a string
                 path_to_save = file_path[0] if isinstance(file_path, (list, tuple)) else file_path
-                _, full_html = generate_html(payload)
-                with open(path_to_save, 'w', encoding='utf-8') as f:
-                    f.write(full_html)
+                # The page is streamed through a large buffer rather than built as one string.
+                # It goes to a temporary file beside the target, which only replaces the
+                # previous export once the whole page has been written.
+                tmp_path = path_to_save + '.tmp'
+                try:
+                    with open(tmp_path, 'w', encoding='utf-8', buffering=1 << 20) as f:
+                        write_html(payload, f)
+                    os.replace(tmp_path, path_to_save)
+                except BaseException:
+                    if os.path.exists(tmp_path):
+                        os.remove(tmp_path)
+                    raise
                 return {'status': 'success', 'message': f'Successfully exported to {os.path.basename(path_to_save)}'}
             return {'status': 'info', 'message': 'Export cancelled.'}
         except Exception as e:
@@ -69,8 +73,14 @@ class Api:
             file_path = self.window.create_file_dialog(webview.SAVE_DIALOG, file_types=file_types)
             if file_path:
                 path_to_save = file_path[0] if isinstance(file_path, (list, tuple)) else file_path
-                with open(path_to_save, 'w', encoding='utf-8') as f:
-                    json.dump(payload, f, indent=2)
+                if orjson:
+                    # Encoded to UTF-8 bytes in one call and written with a single write
+                    data = orjson.dumps(payload, option=orjson.OPT_INDENT_2)
+                    with open(path_to_save, 'wb') as f:
+                        f.write(data)
+                else:
+                    with open(path_to_save, 'w', encoding='utf-8') as f:
+                        json.dump(payload, f, indent=2)
                 return {'status': 'success', 'message': f'Project saved to {os.path.basename(path_to_save)}'}
             return {'status': 'info', 'message': 'Save cancelled.'}
         except Exception as e:
@@ -85,8 +95,9 @@ class Api:
             file_path = self.window.create_file_dialog(webview.OPEN_DIALOG, file_types=file_types)
             if file_path:
                 path_to_load = file_path[0] if isinstance(file_path, (list, tuple)) else file_path
-                with open(path_to_load, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
+                # A large read buffer keeps big project files to a handful of read calls
+                with open(path_to_load, 'rb', buffering=1 << 20) as f:
+                    data = orjson.loads(f.read()) if orjson else json.load(f)
                 return {'status': 'success', 'data': data}
             return {'status': 'info', 'message': 'Load cancelled.'}
         except Exception as e:
@@ -103,11 +114,16 @@ class Api:
                 return {'status': 'info', 'message': 'Import cancelled.'}
 
             actual_path = file_path[0] if isinstance(file_path, (list, tuple)) else file_path
+            from html_parser import parse_html_to_project
             
-            with open(actual_path, 'r', encoding='utf-8') as f:
-                html_content = f.read()
-
-            project_data = parse_html_to_project(html_content, os.path.dirname(actual_path))
+            base_path = os.path.dirname(actual_path)
+            with open(actual_path, 'rb') as f:
+                if os.fstat(f.fileno()).st_size:
+                    # lxml parses straight from the mapped file, without an intermediate Python string
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as html_content:
+                        project_data = parse_html_to_project(html_content, base_path)
+                else: # Empty files cannot be mapped
+                    project_data = parse_html_to_project(b'', base_path)
             
             return {'status': 'success', 'data': project_data}
         except Exception as e:
@@ -117,8 +133,3 @@ class Api:
 
 # Create a single instance of the API
 api_instance = Api()
-
-@app.route('/')
-def index():
-    """Serves the main editor UI."""
-    return send_from_directory('frontend', 'index.html')
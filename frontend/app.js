@@ -23,6 +23,17 @@ document.addEventListener('DOMContentLoaded', () => {
     const toggleHierarchyBtn = document.getElementById('toggle-hierarchy');
     const togglePropertiesBtn = document.getElementById('toggle-properties');
 
+    // Properties form: cloned once from its template, then only refilled when the selection changes
+    const emptyPropertiesMessage = propertiesPanel.querySelector('p');
+    propertiesPanel.appendChild(document.getElementById('properties-template').content.cloneNode(true));
+    const propertiesForm = document.getElementById('properties-form');
+    const idInput = propertiesForm.querySelector('[data-field="id"]');
+    const propInputs = Array.from(propertiesForm.querySelectorAll('[data-prop]'));
+    const styleInputs = Array.from(propertiesForm.querySelectorAll('[data-style]'));
+    const styleInputByKey = Object.fromEntries(styleInputs.map(input => [input.dataset.style, input]));
+    const flexContainerGroup = propertiesForm.querySelector('[data-group="flex-container"]');
+    const flexItemGroup = propertiesForm.querySelector('[data-group="flex-item"]');
+
     // --- Application State ---
     let project = {
         components: [],
@@ -36,29 +47,76 @@ document.addEventListener('DOMContentLoaded', () => {
     let selectedComponentId = null;
     let contextMenuTargetId = null;
     let dragData = {}; // For more robust drag-and-drop
+    let renderScheduled = false;
+    // The pointer drag in progress: a component 'move' or 'resize', or a 'panel' splitter drag
+    const dragState = {
+        kind: null,
+        startX: 0, startY: 0,
+        initialX: 0, initialY: 0, // left/top when moving, width/height when resizing
+        element: null, component: null,
+        resizer: null, // panelResizers entry when dragging a splitter
+        latestEvent: null, pendingFrame: null
+    };
+    // Flat lookups over the component tree, kept in step with edits and rebuilt lazily when a project is loaded
+    const componentIndex = new Map();
+    const parentIndex = new Map();
+    let componentIndexDirty = true;
+    // Set when the tree repeats an id (common in imported HTML); deletes then rebuild the lookups instead of patching them
+    let componentIndexHasDuplicates = false;
 
     // --- Core Functions ---
 
-    function findComponent(id, comps = project.components) {
-        for (const comp of comps) {
-            if (comp.id === id) return comp;
+    // Rebuilds the id -> component and id -> parent lookups with a single walk of the tree.
+    function rebuildComponentIndex() {
+        componentIndexDirty = false;
+        componentIndexHasDuplicates = false;
+        componentIndex.clear();
+        parentIndex.clear();
+        project.components.forEach(comp => indexComponent(comp, null));
+    }
+
+    // Adds a component and its descendants to the lookups.
+    function indexComponent(component, parent) {
+        const stack = [[component, parent]];
+        while (stack.length) {
+            const [comp, compParent] = stack.pop();
+            // First match wins for a duplicated id, as with the old tree search, but its children are still indexed
+            if (!componentIndex.has(comp.id)) {
+                componentIndex.set(comp.id, comp);
+                parentIndex.set(comp.id, compParent);
+            } else if (componentIndex.get(comp.id) !== comp) {
+                componentIndexHasDuplicates = true;
+            }
             if (comp.children) {
-                const found = findComponent(id, comp.children);
-                if (found) return found;
+                for (let i = comp.children.length - 1; i >= 0; i--) stack.push([comp.children[i], comp]);
             }
         }
-        return null;
     }
 
-    function findParent(childId, comps = project.components, parent = null) {
-        for (const comp of comps) {
-            if (comp.id === childId) return parent;
-            if (comp.children) {
-                const found = findParent(childId, comp.children, comp);
-                if (found) return found;
-            }
+    // Drops a component and its descendants from the lookups.
+    function unindexComponent(component) {
+        // Removing one copy of a repeated id may have to promote another copy, so start over
+        if (componentIndexHasDuplicates) {
+            componentIndexDirty = true;
+            return;
+        }
+        const stack = [component];
+        while (stack.length) {
+            const comp = stack.pop();
+            componentIndex.delete(comp.id);
+            parentIndex.delete(comp.id);
+            if (comp.children) stack.push(...comp.children);
         }
-        return null;
+    }
+
+    function findComponent(id) {
+        if (componentIndexDirty) rebuildComponentIndex();
+        return componentIndex.get(id) || null;
+    }
+
+    function findParent(childId) {
+        if (componentIndexDirty) rebuildComponentIndex();
+        return parentIndex.get(childId) || null;
     }
 
     function getNewId() {
@@ -137,16 +195,20 @@ document.addEventListener('DOMContentLoaded', () => {
         } else {
             project.components.push(newComp);
         }
-        renderAll();
+        indexComponent(newComp, parent);
+        scheduleRender();
         selectComponent(id);
     }
     
     function deleteComponent(id) {
+        const component = findComponent(id);
+        if (!component) return false;
         const parent = findParent(id);
         const sourceList = parent ? parent.children : project.components;
-        const index = sourceList.findIndex(c => c.id === id);
+        const index = sourceList.indexOf(component);
         if (index > -1) {
             sourceList.splice(index, 1);
+            unindexComponent(component);
             delete project.elementCss[id];
             delete project.elementJs[id];
             return true;
@@ -156,17 +218,29 @@ document.addEventListener('DOMContentLoaded', () => {
 
     // --- Rendering Functions ---
 
+    // Structural edits can arrive several times per frame; batch them into one renderAll.
+    // Callers update the lookups themselves, so handlers running before the frame already see the new tree.
+    function scheduleRender() {
+        if (renderScheduled) return;
+        renderScheduled = true;
+        requestAnimationFrame(() => {
+            renderScheduled = false;
+            renderAll();
+        });
+    }
+
     function renderAll() {
-        canvas.innerHTML = '';
-        hierarchyPanel.innerHTML = '';
-        
+        if (componentIndexDirty) rebuildComponentIndex();
+        // Both trees are built detached and swapped in with one write each
+        const canvasContent = document.createDocumentFragment();
         const hierarchyRoot = document.createElement('ul');
         project.components.forEach(comp => {
             const wrapper = renderComponentOnCanvas(comp);
-            if (wrapper) canvas.appendChild(wrapper);
+            if (wrapper) canvasContent.appendChild(wrapper);
             hierarchyRoot.appendChild(renderComponentInHierarchy(comp));
         });
-        hierarchyPanel.appendChild(hierarchyRoot);
+        canvas.replaceChildren(canvasContent);
+        hierarchyPanel.replaceChildren(hierarchyRoot);
         
         updatePropertiesPanel();
     }
@@ -212,16 +286,17 @@ document.addEventListener('DOMContentLoaded', () => {
             });
         }
 
-        addInteractionListeners(wrapper, component);
-        if (selectedComponentId === component.id) {
-            const resizer = document.createElement('div');
-            resizer.className = 'resizer br';
-            wrapper.appendChild(resizer);
-            addResizerListeners(resizer, wrapper, component);
-        }
+        wrapper.draggable = wrapper.classList.contains('flex-layout-item'); // Only flex items are draggable for reordering
+        if (selectedComponentId === component.id) attachResizer(wrapper);
         return wrapper;
     }
 
+    function attachResizer(wrapper) {
+        const resizer = document.createElement('div');
+        resizer.className = 'resizer br';
+        wrapper.appendChild(resizer);
+    }
+
     function renderComponentInHierarchy(component) {
         const li = document.createElement('li');
         li.className = `component-item ${component.type}`;
@@ -231,10 +306,6 @@ document.addEventListener('DOMContentLoaded', () => {
         
         const ICONS = { header: 'fa-window-maximize', content: 'fa-align-justify', footer: 'fa-shoe-prints', div: 'fa-square-full', text: 'fa-font', button: 'fa-mouse-pointer', img: 'fa-image', svg: 'fa-vector-square', checkbox: 'fa-check-square', slider: 'fa-sliders-h' };
         li.innerHTML = `<i class="fas ${ICONS[component.type] || 'fa-question-circle'} mr-2 w-4"></i><span>${component.name}</span>`;
-        
-        li.addEventListener('click', e => { e.stopPropagation(); selectComponent(component.id); });
-        li.addEventListener('contextmenu', e => { e.preventDefault(); e.stopPropagation(); showContextMenu(e, component.id); });
-        addHierarchyDragListeners(li);
 
         if (component.children && component.children.length > 0) {
             const childrenUl = document.createElement('ul');
@@ -247,105 +318,38 @@ document.addEventListener('DOMContentLoaded', () => {
     
     function updatePropertiesPanel() {
         const component = findComponent(selectedComponentId);
-        if (!component) {
-            propertiesPanel.innerHTML = '<p class="text-gray-400">Select an element to edit.</p>';
-            return;
-        }
+        emptyPropertiesMessage.hidden = !!component;
+        propertiesForm.hidden = !component;
+        if (!component) return;
 
         const parent = findParent(selectedComponentId);
-        const isFlexChild = parent?.style.display === 'flex';
-        
-        const createProp = (label, prop, value, type = 'text') => `<div><label>${label}</label><input type="${type}" data-prop="${prop}" value="${value || ''}"></div>`;
-        const createStyle = (label, style, value, type = 'text') => `<div><label>${label}</label><input type="${type}" data-style="${style}" value="${value || ''}"></div>`;
-        const createSelect = (label, style, value, options) => `<div><label>${label}</label><select data-style="${style}">${options.map(o => `<option value="${o}" ${value === o ? 'selected' : ''}>${o}</option>`).join('')}</select></div>`;
-
-        const generalProps = `
-            ${createProp('Name', 'name', component.name)}
-            <div><label>ID</label><input type="text" value="${component.id}" readonly class="bg-gray-700 cursor-not-allowed"></div>
-            <div><label>Text Content</label><textarea data-prop="text">${component.text || ''}</textarea></div>
-        `;
+        flexContainerGroup.hidden = component.style.display !== 'flex';
+        flexItemGroup.hidden = parent?.style.display !== 'flex';
+
+        idInput.value = component.id;
+        propInputs.forEach(input => { input.value = component[input.dataset.prop] || ''; });
+        styleInputs.forEach(input => {
+            input.value = component.style[input.dataset.style] || '';
+            if (input.tagName === 'SELECT' && input.selectedIndex === -1) input.selectedIndex = 0;
+        });
+    }
 
-        let layoutProps = `
-            <details class="prop-group" open><summary>Position & Size</summary><div class="p-2 space-y-2">
-            ${createSelect('Position', 'position', component.style.position, ['absolute', 'relative', 'static', 'fixed', 'sticky'])}
-            <div class="prop-grid">
-                ${createStyle('Left', 'left', component.style.left)}
-                ${createStyle('Top', 'top', component.style.top)}
-                ${createStyle('Right', 'right', component.style.right)}
-                ${createStyle('Bottom', 'bottom', component.style.bottom)}
-                ${createStyle('Width', 'width', component.style.width)}
-                ${createStyle('Height', 'height', component.style.height)}
-                ${createStyle('Min W', 'minWidth', component.style.minWidth)}
-                ${createStyle('Min H', 'minHeight', component.style.minHeight)}
-                ${createStyle('Max W', 'maxWidth', component.style.maxWidth)}
-                ${createStyle('Max H', 'maxHeight', component.style.maxHeight)}
-            </div>
-            </div></details>
-        `;
+    // Single-property edits only touch the one live element instead of re-rendering the tree.
+    function applyStylePatch(componentId, style, value) {
+        const el = document.getElementById(componentId);
+        if (el) el.style[style] = value;
+    }
 
-        let flexContainerProps = '';
-        if (component.style.display === 'flex') {
-            flexContainerProps = `
-                <details class="prop-group" open><summary>Flex Container</summary><div class="p-2 space-y-2">
-                <div class="prop-grid">
-                    ${createSelect('Direction', 'flexDirection', component.style.flexDirection, ['row', 'column', 'row-reverse', 'column-reverse'])}
-                    ${createSelect('Wrap', 'flexWrap', component.style.flexWrap, ['nowrap', 'wrap', 'wrap-reverse'])}
-                    ${createSelect('Justify Content', 'justifyContent', component.style.justifyContent, ['flex-start', 'center', 'flex-end', 'space-between', 'space-around', 'space-evenly'])}
-                    ${createSelect('Align Items', 'alignItems', component.style.alignItems, ['flex-start', 'center', 'flex-end', 'stretch', 'baseline'])}
-                    ${createSelect('Align Content', 'alignContent', component.style.alignContent, ['flex-start', 'center', 'flex-end', 'space-between', 'space-around', 'stretch'])}
-                    ${createStyle('Gap', 'gap', component.style.gap)}
-                </div>
-                </div></details>
-            `;
-        }
-        
-        let flexItemProps = '';
-        if (isFlexChild) {
-            flexItemProps = `
-                <details class="prop-group" open><summary>Flex Item</summary><div class="p-2 space-y-2">
-                <div class="prop-grid">
-                    ${createStyle('Flex Grow', 'flexGrow', component.style.flexGrow, 'number')}
-                    ${createStyle('Flex Shrink', 'flexShrink', component.style.flexShrink, 'number')}
-                    ${createStyle('Flex Basis', 'flexBasis', component.style.flexBasis)}
-                    ${createStyle('Order', 'order', component.style.order, 'number')}
-                    ${createSelect('Align Self', 'alignSelf', component.style.alignSelf, ['auto', 'flex-start', 'center', 'flex-end', 'stretch', 'baseline'])}
-                </div>
-                </div></details>
-            `;
+    // The component's text is rendered as the wrapper's leading text node, ahead of any children.
+    function applyTextPatch(componentId, text) {
+        const el = document.getElementById(componentId);
+        if (!el) return;
+        const textNode = el.firstChild?.nodeType === Node.TEXT_NODE ? el.firstChild : null;
+        if (textNode) {
+            textNode.data = text;
+        } else if (text) {
+            el.insertBefore(document.createTextNode(text), el.firstChild);
         }
-
-        const appearanceProps = `
-            <details class="prop-group"><summary>Appearance</summary><div class="p-2 space-y-2">
-                ${createSelect('Display', 'display', component.style.display, ['block', 'inline-block', 'flex', 'grid', 'inline', 'none'])}
-                ${createStyle('Background', 'background', component.style.background)}
-                ${createStyle('Color', 'color', component.style.color, 'color')}
-                ${createStyle('Border', 'border', component.style.border)}
-                ${createStyle('Border Radius', 'borderRadius', component.style.borderRadius)}
-                ${createStyle('Box Shadow', 'boxShadow', component.style.boxShadow)}
-                ${createStyle('Opacity', 'opacity', component.style.opacity, 'number')}
-                ${createStyle('Z-Index', 'zIndex', component.style.zIndex, 'number')}
-                ${createSelect('Overflow', 'overflow', component.style.overflow, ['visible', 'hidden', 'scroll', 'auto'])}
-            </div></details>
-        `;
-        
-        const spacingProps = `
-            <details class="prop-group"><summary>Spacing</summary><div class="p-2 space-y-2">
-            <div class="prop-grid">
-                ${createStyle('Margin', 'margin', component.style.margin)}
-                ${createStyle('Padding', 'padding', component.style.padding)}
-            </div>
-            </div></details>
-        `;
-
-        propertiesPanel.innerHTML = `
-            <details class="prop-group" open><summary>General</summary><div class="p-2 space-y-2">${generalProps}</div></details>
-            ${layoutProps}
-            ${flexContainerProps}
-            ${flexItemProps}
-            ${appearanceProps}
-            ${spacingProps}
-            <button id="delete-btn" class="mt-4 bg-red-600 hover:bg-red-700 text-white font-bold py-2 px-4 rounded w-full">Delete</button>
-        `;
     }
 
     // --- Event Handlers & Listeners ---
@@ -353,6 +357,7 @@ document.addEventListener('DOMContentLoaded', () => {
     function selectComponent(id) {
         if (selectedComponentId === id) return;
         
+        const previousId = selectedComponentId;
         selectedComponentId = id;
 
         if (id) {
@@ -363,105 +368,99 @@ document.addEventListener('DOMContentLoaded', () => {
             elementJsEditor.value = '';
         }
         
-        renderAll();
+        renderSelection(previousId, id);
+        updatePropertiesPanel();
     }
 
-    function addInteractionListeners(element, component) {
-        const isFlexItem = element.classList.contains('flex-layout-item');
-        element.draggable = isFlexItem; // Only flex items are draggable for reordering
-
-        // Mousedown for selecting and absolute dragging
-        element.addEventListener('mousedown', e => {
-            if (e.target.closest('.resizer')) return;
-            e.stopPropagation();
-            selectComponent(component.id);
-            
-            // Allow dragging only if the element is absolutely positioned
-            if (component.style.position !== 'absolute') return;
-
-            const startMouseX = e.clientX, startMouseY = e.clientY;
-            const initialLeft = parseFloat(component.style.left || 0), initialTop = parseFloat(component.style.top || 0);
-            
-            const onMouseMove = moveEvent => {
-                const dx = moveEvent.clientX - startMouseX, dy = moveEvent.clientY - startMouseY;
-                component.style.left = `${initialLeft + dx}px`;
-                component.style.top = `${initialTop + dy}px`;
-                element.style.left = component.style.left;
-                element.style.top = component.style.top;
-            };
-            
-            const onMouseUp = () => {
-                document.removeEventListener('mousemove', onMouseMove);
-                document.removeEventListener('mouseup', onMouseUp);
-                updatePropertiesPanel();
-            };
-            
-            document.addEventListener('mousemove', onMouseMove);
-            document.addEventListener('mouseup', onMouseUp);
-        });
+    // Moves the selection highlight and resize handle in place; selecting never changes the tree,
+    // so the canvas and hierarchy are patched instead of rebuilt.
+    function renderSelection(previousId, id) {
+        if (previousId) {
+            const oldWrapper = canvas.querySelector(`.component-wrapper[data-id="${CSS.escape(previousId)}"]`);
+            if (oldWrapper) {
+                oldWrapper.classList.remove('selected');
+                oldWrapper.querySelector(':scope > .resizer')?.remove();
+            }
+            hierarchyPanel.querySelector(`.component-item[data-id="${CSS.escape(previousId)}"]`)?.classList.remove('selected');
+        }
 
-        // --- Flexbox Drag-and-Drop Logic ---
-        element.addEventListener('dragstart', e => {
-            if (!isFlexItem) { e.preventDefault(); return; }
-            e.stopPropagation();
-            dragData.sourceId = component.id;
-            e.dataTransfer.setData('text/plain', component.id);
-            e.dataTransfer.effectAllowed = 'move';
-            setTimeout(() => e.target.style.opacity = '0.5', 0);
-        });
+        const component = findComponent(id);
+        if (!component) return;
+        const wrapper = canvas.querySelector(`.component-wrapper[data-id="${CSS.escape(id)}"]`);
+        if (wrapper) {
+            wrapper.classList.add('selected');
+            attachResizer(wrapper);
+        }
+        hierarchyPanel.querySelector(`.component-item[data-id="${CSS.escape(id)}"]`)?.classList.add('selected');
+    }
 
-        element.addEventListener('dragend', e => {
-            if (!isFlexItem) return;
-            e.stopPropagation();
-            e.target.style.opacity = '1';
-            dragData = {};
-            document.querySelectorAll('.drag-placeholder').forEach(p => p.remove());
-        });
+    // Starts moving an absolutely positioned component with the mouse.
+    function startComponentDrag(e, element, component) {
+        // Allow dragging only if the element is absolutely positioned
+        if (component.style.position !== 'absolute') return;
+        beginPointerDrag('move', e, { element, component, initialX: parseFloat(component.style.left || 0), initialY: parseFloat(component.style.top || 0) });
+    }
 
-        element.addEventListener('dragover', e => {
-            if (!dragData.sourceId) return;
+    // Starts resizing a component from its bottom-right handle.
+    function startComponentResize(e, element, component) {
+        e.preventDefault();
+        beginPointerDrag('resize', e, { element, component, initialX: element.offsetWidth, initialY: element.offsetHeight });
+    }
 
-            const targetContainer = e.target.closest('.flex-layout-container');
-            if (!targetContainer) return;
-            
-            e.preventDefault();
-            e.stopPropagation();
-            e.dataTransfer.dropEffect = 'move';
-
-            const placeholder = getPlaceholder();
-            const targetItem = e.target.closest('.flex-layout-item');
-            
-            if (targetItem && targetItem.id !== dragData.sourceId) {
-                const rect = targetItem.getBoundingClientRect();
-                const parentComp = findComponent(targetContainer.dataset.id);
-                const isColumn = parentComp.style.flexDirection?.includes('column');
-                const isAfter = isColumn ? (e.clientY > rect.top + rect.height / 2) : (e.clientX > rect.left + rect.width / 2);
-                targetContainer.insertBefore(placeholder, isAfter ? targetItem.nextSibling : targetItem);
-            } else if (!targetItem) {
-                targetContainer.appendChild(placeholder);
-            }
-        });
+    function beginPointerDrag(kind, e, fields) {
+        Object.assign(dragState, { kind, startX: e.clientX, startY: e.clientY }, fields);
+    }
 
-        element.addEventListener('drop', e => {
-            if (!dragData.sourceId) return;
-            e.preventDefault();
-            e.stopPropagation();
-            
-            const placeholder = document.querySelector('.drag-placeholder');
-            if (!placeholder || !placeholder.parentNode) return;
+    // Writes the latest pointer position of a component move or resize to the model, the element and the panel.
+    function applyComponentDrag() {
+        dragState.pendingFrame = null;
+        const { kind, element, component, latestEvent } = dragState;
+        const [keyX, keyY] = kind === 'move' ? ['left', 'top'] : ['width', 'height'];
+        component.style[keyX] = `${dragState.initialX + (latestEvent.clientX - dragState.startX)}px`;
+        component.style[keyY] = `${dragState.initialY + (latestEvent.clientY - dragState.startY)}px`;
+        element.style[keyX] = styleInputByKey[keyX].value = component.style[keyX];
+        element.style[keyY] = styleInputByKey[keyY].value = component.style[keyY];
+    }
 
-            const oldParent = findParent(dragData.sourceId);
-            const newParent = findComponent(placeholder.parentNode.dataset.id);
-            if (!oldParent || !newParent) return;
+    // Every pointer drag shares this one pair of document listeners; mousedown handlers only fill in dragState.
+    document.addEventListener('mousemove', e => {
+        if (!dragState.kind) return;
+        if (dragState.kind === 'panel') {
+            resizePanel(e);
+            return;
+        }
+        // Mousemove can fire many times per frame; only the latest position is applied, once per frame
+        dragState.latestEvent = e;
+        if (!dragState.pendingFrame) dragState.pendingFrame = requestAnimationFrame(applyComponentDrag);
+    });
 
-            const sourceIndex = oldParent.children.findIndex(c => c.id === dragData.sourceId);
-            const [draggedComp] = oldParent.children.splice(sourceIndex, 1);
-            
-            const placeholderIndex = Array.from(placeholder.parentNode.children).indexOf(placeholder);
-            newParent.children.splice(placeholderIndex, 0, draggedComp);
+    document.addEventListener('mouseup', () => {
+        if (!dragState.kind) return;
+        if (dragState.pendingFrame) {
+            cancelAnimationFrame(dragState.pendingFrame);
+            applyComponentDrag();
+        }
+        if (dragState.kind === 'panel') document.body.style.cursor = 'default';
+        Object.assign(dragState, { kind: null, element: null, component: null, resizer: null, latestEvent: null });
+    });
 
-            renderAll();
-        });
+    // Moves the dragged flex item to where its placeholder was dropped.
+    function moveFlexItem() {
+        const placeholder = document.querySelector('.drag-placeholder');
+        if (!placeholder || !placeholder.parentNode) return;
+
+        const oldParent = findParent(dragData.sourceId);
+        const newParent = findComponent(placeholder.parentNode.dataset.id);
+        if (!oldParent || !newParent) return;
+
+        const sourceIndex = oldParent.children.findIndex(c => c.id === dragData.sourceId);
+        const [draggedComp] = oldParent.children.splice(sourceIndex, 1);
+        
+        const placeholderIndex = Array.from(placeholder.parentNode.children).indexOf(placeholder);
+        newParent.children.splice(placeholderIndex, 0, draggedComp);
+        parentIndex.set(draggedComp.id, newParent);
+
+        scheduleRender();
     }
 
     function getPlaceholder() {
@@ -478,92 +477,6 @@ document.addEventListener('DOMContentLoaded', () => {
         return placeholder;
     }
 
-    function addResizerListeners(resizer, element, component) {
-        resizer.addEventListener('mousedown', e => {
-            e.preventDefault();
-            e.stopPropagation();
-            const startMouseX = e.clientX, startMouseY = e.clientY;
-            const initialWidth = element.offsetWidth, initialHeight = element.offsetHeight;
-            
-            const onMouseMove = moveEvent => {
-                component.style.width = `${initialWidth + (moveEvent.clientX - startMouseX)}px`;
-                component.style.height = `${initialHeight + (moveEvent.clientY - startMouseY)}px`;
-                element.style.width = component.style.width;
-                element.style.height = component.style.height;
-            };
-            
-            const onMouseUp = () => {
-                document.removeEventListener('mousemove', onMouseMove);
-                document.removeEventListener('mouseup', onMouseUp);
-                updatePropertiesPanel();
-            };
-            
-            document.addEventListener('mousemove', onMouseMove);
-            document.addEventListener('mouseup', onMouseUp);
-        });
-    }
-
-    function addHierarchyDragListeners(element) {
-        element.addEventListener('dragstart', e => {
-            e.stopPropagation();
-            e.dataTransfer.setData('text/plain', element.dataset.id);
-            e.dataTransfer.effectAllowed = 'move';
-        });
-
-        element.addEventListener('dragover', e => {
-            e.preventDefault();
-            e.stopPropagation();
-            element.style.backgroundColor = '#4b82f6';
-        });
-
-        element.addEventListener('dragleave', e => {
-            e.stopPropagation();
-            element.style.backgroundColor = '';
-        });
-
-        element.addEventListener('drop', e => {
-            e.preventDefault();
-            e.stopPropagation();
-            element.style.backgroundColor = '';
-            
-            const draggedId = e.dataTransfer.getData('text/plain');
-            const targetId = element.dataset.id;
-            if (draggedId === targetId) return;
-
-            const draggedComponent = findComponent(draggedId);
-            const targetComponent = findComponent(targetId);
-            if (!draggedComponent || !targetComponent) return;
-
-            // Prevent dropping a parent into its own child
-            let temp = targetComponent;
-            while(temp = findParent(temp.id)) {
-                if (temp.id === draggedId) return;
-            }
-
-            // Remove from old parent
-            const oldParent = findParent(draggedId);
-            const sourceList = oldParent ? oldParent.children : project.components;
-            const index = sourceList.findIndex(c => c.id === draggedId);
-            if (index > -1) sourceList.splice(index, 1);
-            
-            // Add to new parent
-            targetComponent.children.push(draggedComponent);
-            
-            // Update positioning based on new parent
-            if (targetComponent.style.display === 'flex') {
-                draggedComponent.style.position = 'relative';
-                delete draggedComponent.style.left;
-                delete draggedComponent.style.top;
-            } else {
-                draggedComponent.style.position = 'absolute';
-                draggedComponent.style.left = '10px';
-                draggedComponent.style.top = '10px';
-            }
-
-            renderAll();
-        });
-    }
-
     function showContextMenu(event, componentId) {
         contextMenu.style.display = 'block';
         contextMenu.style.left = `${event.clientX}px`;
@@ -589,13 +502,93 @@ document.addEventListener('DOMContentLoaded', () => {
         } else if (action === 'delete') {
             deleteComponent(contextMenuTargetId);
             if (selectedComponentId === contextMenuTargetId) selectedComponentId = null;
-            renderAll();
+            scheduleRender();
         }
         contextMenu.style.display = 'none';
     });
 
     document.addEventListener('click', () => { contextMenu.style.display = 'none'; });
 
+    // --- Hierarchy Listeners ---
+    // Bound once on the panel; each event is resolved to the innermost item under the pointer.
+    hierarchyPanel.addEventListener('click', e => {
+        const item = e.target.closest('.component-item');
+        if (!item) return;
+        e.stopPropagation();
+        selectComponent(item.dataset.id);
+    });
+
+    hierarchyPanel.addEventListener('contextmenu', e => {
+        const item = e.target.closest('.component-item');
+        if (!item) return;
+        e.preventDefault();
+        e.stopPropagation();
+        showContextMenu(e, item.dataset.id);
+    });
+
+    hierarchyPanel.addEventListener('dragstart', e => {
+        const item = e.target.closest('.component-item');
+        if (!item) return;
+        e.dataTransfer.setData('text/plain', item.dataset.id);
+        e.dataTransfer.effectAllowed = 'move';
+    });
+
+    hierarchyPanel.addEventListener('dragover', e => {
+        const item = e.target.closest('.component-item');
+        if (!item) return;
+        e.preventDefault();
+        item.style.backgroundColor = '#4b82f6';
+    });
+
+    hierarchyPanel.addEventListener('dragleave', e => {
+        const item = e.target.closest('.component-item');
+        if (item) item.style.backgroundColor = '';
+    });
+
+    hierarchyPanel.addEventListener('drop', e => {
+        const item = e.target.closest('.component-item');
+        if (!item) return;
+        e.preventDefault();
+        item.style.backgroundColor = '';
+        
+        const draggedId = e.dataTransfer.getData('text/plain');
+        const targetId = item.dataset.id;
+        if (draggedId === targetId) return;
+
+        const draggedComponent = findComponent(draggedId);
+        const targetComponent = findComponent(targetId);
+        if (!draggedComponent || !targetComponent) return;
+
+        // Prevent dropping a parent into its own child
+        let temp = targetComponent;
+        while(temp = findParent(temp.id)) {
+            if (temp.id === draggedId) return;
+        }
+
+        // Remove from old parent
+        const oldParent = findParent(draggedId);
+        const sourceList = oldParent ? oldParent.children : project.components;
+        const index = sourceList.findIndex(c => c.id === draggedId);
+        if (index > -1) sourceList.splice(index, 1);
+        
+        // Add to new parent
+        targetComponent.children.push(draggedComponent);
+        parentIndex.set(draggedId, targetComponent);
+        
+        // Update positioning based on new parent
+        if (targetComponent.style.display === 'flex') {
+            draggedComponent.style.position = 'relative';
+            delete draggedComponent.style.left;
+            delete draggedComponent.style.top;
+        } else {
+            draggedComponent.style.position = 'absolute';
+            draggedComponent.style.left = '10px';
+            draggedComponent.style.top = '10px';
+        }
+
+        scheduleRender();
+    });
+
     // --- Global Event Listeners for Toolbar Drag ---
     toolbar.addEventListener('dragstart', e => {
         dragData.sourceType = e.target.dataset.type;
@@ -603,10 +596,69 @@ document.addEventListener('DOMContentLoaded', () => {
         e.dataTransfer.setData('text/plain', e.target.dataset.type);
     });
     
-    canvas.addEventListener('dragover', e => e.preventDefault());
+    // --- Canvas Listeners ---
+    // Bound once on the canvas and dispatched by the wrapper under the pointer, so re-rendering
+    // never has to re-attach listeners to each component.
+    canvas.addEventListener('mousedown', e => {
+        const wrapper = e.target.closest('.component-wrapper');
+        if (!wrapper) return;
+        const component = findComponent(wrapper.dataset.id);
+        if (!component) return;
+
+        if (e.target.closest('.resizer')) {
+            startComponentResize(e, wrapper, component);
+            return;
+        }
+        selectComponent(component.id);
+        startComponentDrag(e, wrapper, component);
+    });
+
+    // --- Flexbox Drag-and-Drop Logic ---
+    canvas.addEventListener('dragstart', e => {
+        const wrapper = e.target.closest('.component-wrapper');
+        if (!wrapper || !wrapper.classList.contains('flex-layout-item')) { e.preventDefault(); return; }
+        dragData.sourceId = wrapper.dataset.id;
+        e.dataTransfer.setData('text/plain', wrapper.dataset.id);
+        e.dataTransfer.effectAllowed = 'move';
+        setTimeout(() => wrapper.style.opacity = '0.5', 0);
+    });
+
+    canvas.addEventListener('dragend', e => {
+        const wrapper = e.target.closest('.flex-layout-item');
+        if (!wrapper) return;
+        wrapper.style.opacity = '1';
+        dragData = {};
+        document.querySelectorAll('.drag-placeholder').forEach(p => p.remove());
+    });
+
+    canvas.addEventListener('dragover', e => {
+        e.preventDefault();
+        if (!dragData.sourceId) return;
+
+        const targetContainer = e.target.closest('.flex-layout-container');
+        if (!targetContainer) return;
+        e.dataTransfer.dropEffect = 'move';
+
+        const placeholder = getPlaceholder();
+        const targetItem = e.target.closest('.flex-layout-item');
+        
+        if (targetItem && targetItem.id !== dragData.sourceId) {
+            const rect = targetItem.getBoundingClientRect();
+            const parentComp = findComponent(targetContainer.dataset.id);
+            const isColumn = parentComp.style.flexDirection?.includes('column');
+            const isAfter = isColumn ? (e.clientY > rect.top + rect.height / 2) : (e.clientX > rect.left + rect.width / 2);
+            targetContainer.insertBefore(placeholder, isAfter ? targetItem.nextSibling : targetItem);
+        } else if (!targetItem) {
+            targetContainer.appendChild(placeholder);
+        }
+    });
 
     canvas.addEventListener('drop', e => {
         e.preventDefault();
+        if (dragData.sourceId) {
+            moveFlexItem();
+            return;
+        }
         if (!dragData.isNew) return;
 
         const type = e.dataTransfer.getData('text/plain');
@@ -630,6 +682,8 @@ document.addEventListener('DOMContentLoaded', () => {
             if (prop === 'name') {
                 document.querySelector(`.component-item[data-id="${selectedComponentId}"] span`).textContent = value;
                 document.getElementById(selectedComponentId).dataset.name = value;
+            } else if (prop === 'text') {
+                applyTextPatch(selectedComponentId, value);
             }
         } else if (style) {
             if (!component.style) component.style = {};
@@ -640,10 +694,9 @@ document.addEventListener('DOMContentLoaded', () => {
                     delete child.style.left;
                     delete child.style.top;
                 });
-                renderAll();
+                scheduleRender();
             } else {
-                const el = document.getElementById(selectedComponentId);
-                if (el) el.style[style] = value;
+                applyStylePatch(selectedComponentId, style, value);
             }
         }
     });
@@ -652,7 +705,7 @@ document.addEventListener('DOMContentLoaded', () => {
         if (e.target.id === 'delete-btn' && selectedComponentId) {
             deleteComponent(selectedComponentId);
             selectedComponentId = null;
-            renderAll();
+            scheduleRender();
         }
     });
 
@@ -673,7 +726,8 @@ document.addEventListener('DOMContentLoaded', () => {
                     elementCssEditor.value = '';
                     elementJsEditor.value = '';
                     selectedComponentId = null;
-                    renderAll();
+                    componentIndexDirty = true;
+                    scheduleRender();
                 }
                 if (result.message) console.info(result.message);
             } else {
@@ -698,6 +752,8 @@ document.addEventListener('DOMContentLoaded', () => {
         bottom: document.getElementById('bottom-editors')
     };
     const panelSizes = { elements: 224, hierarchy: 288, properties: 384, bottom: 40 };
+    const canvasSection = document.getElementById('canvas-section');
+    let gridUpdateScheduled = false;
 
     function updateGridLayout() {
         mainLayout.style.gridTemplateColumns = [
@@ -709,59 +765,59 @@ document.addEventListener('DOMContentLoaded', () => {
             panels.properties.style.display === 'none' ? '0px' : '5px',
             panels.properties.style.display === 'none' ? '0px' : `${panelSizes.properties}px`,
         ].join(' ');
+        canvasSection.style.gridTemplateRows = `1fr 5px ${panelSizes.bottom}%`;
+    }
+
+    // Every resize and toggle funnels into one grid template write per frame.
+    function scheduleGridUpdate() {
+        if (gridUpdateScheduled) return;
+        gridUpdateScheduled = true;
+        requestAnimationFrame(() => {
+            gridUpdateScheduled = false;
+            updateGridLayout();
+        });
     }
 
     function togglePanel(panelName) {
         const panel = panels[panelName];
         panel.style.display = panel.style.display === 'none' ? '' : 'none';
-        updateGridLayout();
+        scheduleGridUpdate();
     }
     
     toggleElementsBtn.addEventListener('click', () => togglePanel('elements'));
     toggleHierarchyBtn.addEventListener('click', () => togglePanel('hierarchy'));
     togglePropertiesBtn.addEventListener('click', () => togglePanel('properties'));
 
-    function initResizer(resizerId, panelKey, direction) {
-        const resizer = document.getElementById(resizerId);
-        resizer.addEventListener('mousedown', e => {
+    // One entry per splitter. sign is -1 where dragging towards the panel shrinks it;
+    // the bottom editors are sized as a percentage of the window height.
+    const panelResizers = [
+        { id: 'resizer-v1', panelKey: 'elements', axis: 'x', sign: 1, min: 150 },
+        { id: 'resizer-v2', panelKey: 'hierarchy', axis: 'x', sign: 1, min: 150 },
+        { id: 'resizer-v3', panelKey: 'properties', axis: 'x', sign: -1, min: 150 },
+        { id: 'resizer-h1', panelKey: 'bottom', axis: 'y', sign: -1, min: 10, max: 80, percent: true },
+    ];
+
+    function bindResizer(config) {
+        document.getElementById(config.id).addEventListener('mousedown', e => {
             e.preventDefault();
-            document.body.style.cursor = direction === 'col' ? 'col-resize' : 'row-resize';
-            
-            let startPos = direction === 'col' ? e.clientX : e.clientY;
-            
-            const onMouseMove = moveEvent => {
-                const movePos = direction === 'col' ? moveEvent.clientX : moveEvent.clientY;
-                const delta = movePos - startPos;
-
-                if (direction === 'col') {
-                    const currentSize = panelSizes[panelKey];
-                    const newSize = panelKey === 'properties' ? currentSize - delta : currentSize + delta;
-                    panelSizes[panelKey] = Math.max(150, newSize);
-                    updateGridLayout();
-                } else { // row
-                    const currentHeight = panelSizes[panelKey];
-                    const newHeight = currentHeight - (delta / window.innerHeight * 100);
-                    panelSizes[panelKey] = Math.max(10, Math.min(80, newHeight));
-                    document.getElementById('canvas-section').style.gridTemplateRows = `1fr 5px ${panelSizes.bottom}%`;
-                }
-                startPos = movePos;
-            };
-            
-            const onMouseUp = () => {
-                document.body.style.cursor = 'default';
-                document.removeEventListener('mousemove', onMouseMove);
-                document.removeEventListener('mouseup', onMouseUp);
-            };
-            
-            document.addEventListener('mousemove', onMouseMove);
-            document.addEventListener('mouseup', onMouseUp);
+            document.body.style.cursor = config.axis === 'x' ? 'col-resize' : 'row-resize';
+            beginPointerDrag('panel', e, { resizer: config });
         });
     }
 
-    initResizer('resizer-v1', 'elements', 'col');
-    initResizer('resizer-v2', 'hierarchy', 'col');
-    initResizer('resizer-v3', 'properties', 'col');
-    initResizer('resizer-h1', 'bottom', 'row');
+    // Sizes are tracked on every move; the grid itself is only rewritten once per frame
+    function resizePanel(moveEvent) {
+        const { panelKey, axis, sign, min, max = Infinity, percent = false } = dragState.resizer;
+        const startKey = axis === 'x' ? 'startX' : 'startY';
+        const movePos = axis === 'x' ? moveEvent.clientX : moveEvent.clientY;
+        const delta = (movePos - dragState[startKey]) * sign;
+        const newSize = panelSizes[panelKey] + (percent ? delta / window.innerHeight * 100 : delta);
+        panelSizes[panelKey] = Math.max(min, Math.min(max, newSize));
+        dragState[startKey] = movePos;
+        scheduleGridUpdate();
+    }
+
+    panelResizers.forEach(bindResizer);
 
     // --- Initial Render ---
     renderAll();
@@ -1,17 +1,81 @@
 import os
 import re
+import sys
 import base64
-from bs4 import BeautifulSoup, NavigableString
+import mmap
+from functools import lru_cache
+import lxml.html
+from lxml import etree
 import cssutils
+from cssselect import HTMLTranslator, SelectorError
 import logging
 
 # Configure cssutils to be less verbose with expected parsing errors
 cssutils.log.setLevel(logging.CRITICAL)
 
+# One parser for stylesheets and inline styles alike, built with property validation turned off
+_CSS_PARSER = cssutils.CSSParser(validate=False)
+
+# Attributes carried separately on a component rather than in its 'attributes' map
+_SKIP_ATTRS = frozenset(('id', 'style'))
+
+# Tags that map onto a component type of the same name
+_COMPONENT_TAGS = frozenset((
+    'header', 'footer', 'main', 'button', 'svg', 'img', 'p', 'span',
+    'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'div', 'style',
+    'g', 'path', 'line', 'circle', 'rect', 'filter', 'fegaussianblur', 'fecolormatrix', 'feblend',
+))
+
+# Selector patterns used for specificity, compiled once rather than per rule
+_PSEUDO_RE = re.compile(r'::?[\w-]+(\(.*\))?')
+_ID_RE = re.compile(r'#([\w-]+)')
+_CLASS_RE = re.compile(r'\.([\w-]+)')
+_ATTR_SPEC_RE = re.compile(r'\[.*?\]')
+_PSEUDO_CLASS_SPEC_RE = re.compile(r':(not|where|is|has|hover|focus|active|checked|disabled|enabled|target|root|empty|first-child|last-child|nth-child)\b')
+_ELEMENT_SPEC_RE = re.compile(r'(?<![\.#\[:])\b[\w-]+')
+_PSEUDO_ELEMENT_SPEC_RE = re.compile(r'::(before|after|first-line|first-letter|selection|marker|placeholder)')
+_BG_URL_RE = re.compile(r'url\((.*?)\)')
+_KEBAB_RE = re.compile(r'-(\w)')
+
+# Data URI MIME types by file extension; anything unrecognised keeps the previous image/png
+_IMAGE_MIME_TYPES = {
+    '.png': 'image/png', '.jpg': 'image/jpeg', '.jpeg': 'image/jpeg', '.gif': 'image/gif',
+    '.webp': 'image/webp', '.svg': 'image/svg+xml', '.bmp': 'image/bmp', '.ico': 'image/x-icon',
+}
+
+# Raw bytes are decoded by lxml: pages declaring a <meta> charset are left to its own
+# detection, anything else is read as UTF-8 rather than libxml2's latin-1 fallback
+_HTML_PARSER = lxml.html.HTMLParser(encoding='utf-8')
+_CHARSET_SNIFFING_PARSER = lxml.html.HTMLParser()
+_META_CHARSET_RE = re.compile(rb'<meta[^>]+charset', re.IGNORECASE)
+
+# Turns CSS selectors into XPath so lxml can match them against the whole tree in C
+_CSS_TRANSLATOR = HTMLTranslator()
+
+@lru_cache(maxsize=512)
 def _camel_case(s):
-    """Converts a kebab-case string to camelCase."""
-    parts = s.split('-')
-    return parts[0] + ''.join(x.capitalize() for x in parts[1:])
+    """
+    Converts a kebab-case string to camelCase. Results are interned, so every
+    imported element's style dict shares one copy of each property name.
+    A stylesheet only uses a few dozen distinct names, so results are cached.
+    Custom properties keep one leading dash ('--my-var' -> '-MyVar'), which
+    project_generator turns back into '--my-var' on export.
+    """
+    return sys.intern(_KEBAB_RE.sub(lambda m: m.group(1).upper(), s))
+
+def _parse_inline_style(style_str):
+    """
+    Parses the declarations of an inline style attribute into a camelCase
+    style dict. cssutils tokenizes the value, so quoted strings, escapes and
+    nested url()/rgb() groups survive intact.
+    """
+    styles = {}
+    try:
+        for prop in _CSS_PARSER.parseStyle(style_str):
+            styles[_camel_case(prop.name)] = prop.value
+    except Exception:
+        pass
+    return styles
 
 def _get_specificity(selector_text):
     """
@@ -20,120 +84,76 @@ def _get_specificity(selector_text):
     """
     spec = [0, 0, 0]
     # Strip pseudo-classes and pseudo-elements for matching, but account for some structural ones in specificity
-    selector = re.sub(r'::?[\w-]+(\(.*\))?', '', selector_text)
+    selector = _PSEUDO_RE.sub('', selector_text)
     
     # a: Count IDs
-    spec[0] = len(re.findall(r'#[\w-]+', selector))
+    spec[0] = len(_ID_RE.findall(selector))
     
     # b: Count classes, attributes, and some pseudo-classes
-    spec[1] = len(re.findall(r'\.[\w-]+', selector)) + \
-              len(re.findall(r'\[.*?\]', selector)) + \
-              len(re.findall(r':(not|where|is|has|hover|focus|active|checked|disabled|enabled|target|root|empty|first-child|last-child|nth-child)\b', selector_text))
+    spec[1] = len(_CLASS_RE.findall(selector)) + \
+              len(_ATTR_SPEC_RE.findall(selector)) + \
+              len(_PSEUDO_CLASS_SPEC_RE.findall(selector_text))
               
     # c: Count elements and pseudo-elements
-    spec[2] = len(re.findall(r'(?<![\.#\[:])\b[\w-]+', selector)) + \
-              len(re.findall(r'::(before|after|first-line|first-letter|selection|marker|placeholder)', selector_text))
+    spec[2] = len(_ELEMENT_SPEC_RE.findall(selector)) + \
+              len(_PSEUDO_ELEMENT_SPEC_RE.findall(selector_text))
               
     return tuple(spec)
 
-def _element_matches_selector(element, selector_part):
-    """Checks if a single element matches a part of a selector (e.g., 'div.item#main')."""
-    if not hasattr(element, 'name'):
-        return False
-    
-    # Strip pseudo-classes and pseudo-elements for matching purposes
-    selector_part_clean = re.sub(r'::?[\w-]+(\(.*\))?', '', selector_part)
-
-    # Match tag name (e.g., 'div')
-    tag_match = re.match(r'^[\w-]+', selector_part_clean)
-    if tag_match and element.name != tag_match.group(0):
-        return False
-
-    # Match ID (e.g., '#main')
-    id_match = re.search(r'#([\w-]+)', selector_part_clean)
-    if id_match and element.get('id') != id_match.group(1):
-        return False
-
-    # Match classes (e.g., '.item', '.active')
-    class_matches = re.findall(r'\.([\w-]+)', selector_part_clean)
-    if class_matches and not all(c in element.get('class', []) for c in class_matches):
-        return False
-        
-    # Match attributes (e.g., '[type="checkbox"]')
-    attr_matches = re.findall(r'\[([\w-]+)(?:([*^$|~]?=)["\']?(.*?)["\']?)?\]', selector_part_clean)
-    for attr_name, operator, attr_value in attr_matches:
-        el_attr_val = element.get(attr_name)
-        if el_attr_val is None: return False
-        if operator:
-            if operator == '=' and el_attr_val != attr_value: return False
-            if operator == '~=' and attr_value not in el_attr_val.split(): return False
-            if operator == '|=' and not (el_attr_val == attr_value or el_attr_val.startswith(attr_value + '-')): return False
-            if operator == '^=' and not el_attr_val.startswith(attr_value): return False
-            if operator == '$=' and not el_attr_val.endswith(attr_value): return False
-            if operator == '*=' and attr_value not in el_attr_val: return False
-    
-    return True
+@lru_cache(maxsize=4096)
+def _selector_to_xpath(selector_text):
+    """
+    Compiles a CSS selector to an lxml XPath object, or None if cssselect
+    can't translate it. Re-importing the same page during editing reuses
+    the compiled selectors instead of translating them again.
+    """
+    # Pseudo-classes and pseudo-elements are stripped for matching purposes
+    try:
+        return etree.XPath(_CSS_TRANSLATOR.css_to_xpath(_PSEUDO_RE.sub('', selector_text)))
+    except SelectorError:
+        return None
 
-def _matches_selector(element, selector_text):
+def _compile_rules(stylesheet):
     """
-    More robust check if a BeautifulSoup element matches a given CSS selector.
-    Handles descendant selectors correctly by ensuring the final part of the
-    selector matches the element itself.
+    Looks up each style rule's selectors as compiled lxml XPath objects,
+    returning (xpath, specificity, style) entries in stylesheet order.
     """
-    # Handle comma-separated selectors
-    selectors = [s.strip() for s in selector_text.split(',')]
-    for selector in selectors:
-        parts = selector.split()
-        
-        # The last part of the selector (the target) must match the element itself.
-        if not _element_matches_selector(element, parts[-1]):
+    rules = []
+    for rule in stylesheet:
+        if rule.type != cssutils.css.CSSRule.STYLE_RULE:
             continue
+        for selector in rule.selectorList:
+            selector_text = selector.selectorText
+            xpath = _selector_to_xpath(selector_text)
+            if xpath is None:
+                continue
+            rules.append((xpath, _get_specificity(selector_text), rule.style))
+    return rules
 
-        # If there are more parts (ancestors), they must match the parents in order.
-        if len(parts) > 1:
-            current_element = element.find_parent()
-            is_match = True
-            for part in reversed(parts[:-1]):
-                found_ancestor_match = False
-                temp_element = current_element
-                while temp_element:
-                    if _element_matches_selector(temp_element, part):
-                        found_ancestor_match = True
-                        current_element = temp_element.find_parent()
-                        break
-                    temp_element = temp_element.find_parent()
-                
-                if not found_ancestor_match:
-                    is_match = False
-                    break
-            
-            if is_match:
-                return True
-        else:
-            return True # Only one part in the selector, and it matched.
-            
-    return False
-
+def _collect_rule_matches(root, rules):
+    """
+    Runs each compiled rule once over the whole document and returns a map of
+    element -> [(specificity, style)], in stylesheet order.
+    """
+    rule_matches = {}
+    for xpath, specificity, style in rules:
+        # Some translated selectors only fail when evaluated (e.g. svg|rect needs
+        # an undefined namespace prefix); skip them like untranslatable ones
+        try:
+            matched = xpath(root)
+        except etree.XPathError:
+            continue
+        for element in matched:
+            rule_matches.setdefault(element, []).append((specificity, style))
+    return rule_matches
 
-def _compute_styles(element, stylesheet):
+def _compute_styles(element, rule_matches):
     """
     Computes the final styles for an element by applying all matching CSS rules
     from a stylesheet, respecting specificity.
     """
     computed_style = {}
-    matching_rules = []
-
-    if not hasattr(element, 'name'):
-        return {}
-
-    for rule in stylesheet:
-        if rule.type == cssutils.css.CSSRule.STYLE_RULE:
-            for selector in rule.selectorList:
-                if _matches_selector(element, selector.selectorText):
-                    specificity = _get_specificity(selector.selectorText)
-                    matching_rules.append((specificity, rule.style))
-
-    matching_rules.sort(key=lambda x: x[0])
+    matching_rules = sorted(rule_matches.get(element, ()), key=lambda x: x[0])
 
     for _, style in matching_rules:
         for prop in style:
@@ -143,110 +163,162 @@ def _compute_styles(element, stylesheet):
 
 def _determine_type(element):
     """Determines the component type based on tag."""
-    tag = element.name
-    if tag in ['header', 'footer', 'main', 'button', 'svg', 'img', 'p', 'span', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'div', 'style', 'g', 'path', 'line', 'circle', 'rect', 'filter', 'fegaussianblur', 'fecolormatrix', 'feblend']:
+    tag = element.tag
+    if tag in _COMPONENT_TAGS:
         return tag
     if tag == 'input':
         return element.get('type', 'text')
     return 'div'
 
-def _parse_html_element(element, next_id_func, stylesheet, base_path):
+def _embed_image(path, image_cache):
     """
-    Recursively parses a BeautifulSoup element into the application's
-    JSON component structure.
+    Returns the file at path as a base64 data URI. Icons and sprites are often
+    shared by many elements, so each file is only read and encoded once per import.
     """
-    if not hasattr(element, 'name') or not element.name:
+    data_uri = image_cache.get(path)
+    if data_uri is None:
+        with open(path, "rb") as image_file:
+            if os.fstat(image_file.fileno()).st_size:
+                # Encode straight from the mapped file instead of reading a full copy into memory first
+                with mmap.mmap(image_file.fileno(), 0, access=mmap.ACCESS_READ) as image_data:
+                    encoded_string = base64.b64encode(image_data).decode('ascii')
+            else: # Empty files cannot be mapped
+                encoded_string = ''
+        mime_type = _IMAGE_MIME_TYPES.get(os.path.splitext(path)[1].lower(), 'image/png')
+        data_uri = image_cache[path] = f"data:{mime_type};base64,{encoded_string}"
+    return data_uri
+
+def _element_to_component(element, next_id_func, rule_matches, base_path, image_cache):
+    """
+    Builds the component for a single lxml element, with its styles, attributes
+    and direct text but without its children.
+    """
+    if not isinstance(element.tag, str): # Comments and processing instructions
         return None
 
     comp_type = _determine_type(element)
     comp_id = element.get('id') or f"{comp_type}-{next_id_func()}"
 
-    computed_styles = _compute_styles(element, stylesheet)
+    computed_styles = _compute_styles(element, rule_matches)
 
     inline_style_str = element.get('style', '')
     if inline_style_str:
-        try:
-            inline_parser = cssutils.parseStyle(inline_style_str)
-            for prop in inline_parser:
-                computed_styles[_camel_case(prop.name)] = prop.value
-        except Exception:
-            pass
+        computed_styles.update(_parse_inline_style(inline_style_str))
 
     if comp_type == 'img':
         src = element.get('src')
         if src and not src.startswith(('http', 'data:')):
+            image_path = os.path.normpath(os.path.join(base_path, src))
             try:
-                with open(os.path.join(base_path, src), "rb") as image_file:
-                    encoded_string = base64.b64encode(image_file.read()).decode('utf-8')
-                    element['src'] = f"data:image/png;base64,{encoded_string}"
+                element.set('src', _embed_image(image_path, image_cache))
             except Exception as e:
-                print(f"Warning: Image not found: {os.path.join(base_path, src)} - {e}")
+                print(f"Warning: Image not found: {image_path} - {e}")
     
     bg_image = computed_styles.get('backgroundImage', '')
     if 'url(' in bg_image:
-        url_match = re.search(r'url\((.*?)\)', bg_image)
+        url_match = _BG_URL_RE.search(bg_image)
         if url_match:
             url = url_match.group(1).strip('\'"')
             if url and not url.startswith(('http', 'data:')):
+                image_path = os.path.normpath(os.path.join(base_path, url))
                 try:
-                    with open(os.path.join(base_path, url), "rb") as image_file:
-                        encoded_string = base64.b64encode(image_file.read()).decode('utf-8')
-                        computed_styles['backgroundImage'] = f"url('data:image/png;base64,{encoded_string}')"
+                    computed_styles['backgroundImage'] = f"url('{_embed_image(image_path, image_cache)}')"
                 except Exception as e:
-                     print(f"Warning: Background image not found: {os.path.join(base_path, url)} - {e}")
+                     print(f"Warning: Background image not found: {image_path} - {e}")
 
     component = {
         'id': comp_id,
         'type': comp_type,
-        'tag': element.name,
+        'tag': element.tag,
         'name': comp_id,
         'children': [],
         'style': computed_styles,
         'text': '',
-        'attributes': {k: v for k, v in element.attrs.items() if k.lower() not in ['id', 'style']},
+        'attributes': {k: v for k, v in element.attrib.items() if k.lower() not in _SKIP_ATTRS},
         'attachments': []
     }
+    # Class lists stay lists, as the editor and Lua generator expect
+    if 'class' in component['attributes']:
+        component['attributes']['class'] = component['attributes']['class'].split()
 
+    # Direct text lives in element.text and in the tail of each child node
     direct_text = []
-    for content in element.contents:
-        if isinstance(content, NavigableString) and content.strip():
-            direct_text.append(content.strip())
-        elif hasattr(content, 'name') and content.name:
-            child_comp = _parse_html_element(content, next_id_func, stylesheet, base_path)
-            if child_comp:
-                component['children'].append(child_comp)
+    if element.text and element.text.strip():
+        direct_text.append(element.text.strip())
+    for child in element:
+        if child.tail and child.tail.strip():
+            direct_text.append(child.tail.strip())
     
     if direct_text:
         component['text'] = ' '.join(direct_text)
 
     return component
 
+def _parse_html_element(root_element, next_id_func, rule_matches, base_path):
+    """
+    Parses an lxml element and its descendants into the application's
+    JSON component structure. The tree is walked with an explicit stack, so
+    deeply nested documents don't hit the recursion limit; nodes are still
+    visited in document order, keeping the generated ids unchanged.
+    """
+    root_component = None
+    image_cache = {}
+    stack = [(root_element, None)]
+    while stack:
+        element, parent = stack.pop()
+        component = _element_to_component(element, next_id_func, rule_matches, base_path, image_cache)
+        if component is None:
+            continue
+        if parent is None:
+            root_component = component
+        else:
+            parent['children'].append(component)
+        stack.extend((child, component) for child in reversed(element))
+    return root_component
+
 def parse_html_to_project(html_content, base_path):
     """
     Main parsing function. Correctly handles complex HTML by using a robust parser
-    and improved style computation.
+    and improved style computation. html_content may be a str or a bytes-like
+    object such as an mmap of the file.
     """
-    soup = BeautifulSoup(html_content, 'lxml')
+    parser = _HTML_PARSER
+    if isinstance(html_content, str):
+        # lxml rejects str input carrying an XML encoding declaration, so text is
+        # parsed as UTF-8 bytes; its own <meta> charset no longer describes it
+        html_content = html_content.encode('utf-8')
+    elif _META_CHARSET_RE.search(html_content[:1024]):
+        parser = _CHARSET_SNIFFING_PARSER
+    try:
+        root = lxml.html.document_fromstring(html_content, parser=parser)
+    except etree.ParserError:
+        # lxml refuses empty documents; treat them as a page with no content
+        root = lxml.html.document_fromstring('<html></html>')
     
-    full_css_text = ""
-    head = soup.find('head')
-    if head:
-        for link_tag in head.find_all('link', rel='stylesheet'):
-            href = link_tag.get('href')
+    linked_css = []
+    inline_css = []
+    head = root.find('head')
+    if head is not None:
+        # A single pass over the head's own children; linked sheets still precede <style> blocks
+        for child in head:
+            if child.tag == 'style':
+                inline_css.append(child.text or '')
+                continue
+            if child.tag != 'link' or 'stylesheet' not in (child.get('rel') or '').split():
+                continue
+            href = child.get('href')
             if href and not href.startswith('http'):
                 try:
                     with open(os.path.join(base_path, href), 'r', encoding='utf-8') as f:
-                        full_css_text += f.read() + "\n"
+                        linked_css.append(f.read() + "\n")
                 except FileNotFoundError:
                     print(f"Warning: CSS file not found at {os.path.join(base_path, href)}")
-        
-        for style_tag in head.find_all('style'):
-            full_css_text += style_tag.string or ''
+    full_css_text = ''.join(linked_css) + ''.join(inline_css)
             
-    stylesheet = cssutils.parseString(full_css_text, validate=False)
+    stylesheet = _CSS_PARSER.parseString(full_css_text)
 
     global_js = ""
-    for script_tag in soup.find_all('script'):
+    for script_tag in list(root.iter('script')):
         src = script_tag.get('src')
         if src and not src.startswith('http'):
              try:
@@ -254,9 +326,9 @@ def parse_html_to_project(html_content, base_path):
                     global_js += f.read() + "\n"
              except FileNotFoundError:
                 print(f"Warning: JS file not found at {os.path.join(base_path, src)}")
-        elif script_tag.string:
-            global_js += script_tag.string + "\n"
-        script_tag.decompose()
+        elif script_tag.text:
+            global_js += script_tag.text + "\n"
+        script_tag.drop_tree()
 
     _next_id_counter = 1
     def get_next_id():
@@ -266,12 +338,12 @@ def parse_html_to_project(html_content, base_path):
         return val
 
     components = []
-    body = soup.find('body')
-    if body:
+    body = root.find('body')
+    if body is not None:
         # ** FIX: Parse the body tag itself as the root component **
         # This preserves all styles and attributes applied to the body,
         # which is crucial for overall layout.
-        body_comp = _parse_html_element(body, get_next_id, stylesheet, base_path)
+        body_comp = _parse_html_element(body, get_next_id, _collect_rule_matches(root, _compile_rules(stylesheet)), base_path)
         if body_comp:
             components = [body_comp]
 
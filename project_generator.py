@@ -1,107 +1,191 @@
+import io
 import re
 import json
-from bs4 import BeautifulSoup
+from functools import lru_cache
+from html import escape
 
-def generate_html(project_data):
-    """Generates a complete, runnable HTML file from the project structure."""
-    components = project_data.get('components', [])
-    global_css = project_data.get('globalCss', '')
-    global_js = project_data.get('globalJs', '')
-    element_css_map = project_data.get('elementCss', {})
-    element_js_map = project_data.get('elementJs', {})
+_CAMEL_RE = re.compile(r'(?<!^)(?=[A-Z])')
 
-    def style_to_css(style_obj):
-        """Converts a camelCase style object to a CSS string."""
-        if not style_obj:
-            return ""
+# Lua table fields for stateful menu items, keyed by the Lua-safe component id
+_LUA_STATE_TMPL = "state = Functions.{id}_state, action = function(s, v) Functions.{id}_state, Functions.{id}_value = s, v end"
+_LUA_SLIDER_TMPL = "value = Functions.{id}_value, min = {min}, max = {max}, step = {step}"
+
+# Default page styling, shared by the HTML export and the Lua payload
+_PAGE_BASE_CSS = "body { margin: 0; padding: 0; font-family: sans-serif; }"
+
+# Fixed parts of the exported page, written around the generated CSS, body and script
+_PAGE_HEAD = """<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Exported Page</title>
+    <style>
+        """ + _PAGE_BASE_CSS + """
+        """
+_PAGE_BODY = """
+    </style>
+</head>
+<body>
+    """
+_PAGE_SCRIPT = """
+    <script>
+        """
+_PAGE_END = """
+    </script>
+</body>
+</html>"""
+
+# Keys emitted by the generator itself rather than copied from 'attributes'
+_SKIP_ATTRS = frozenset(('style', 'id'))
+
+# Void elements: written without children or a closing tag
+_SELF_CLOSING = frozenset(('img', 'input', 'br', 'hr'))
+
+@lru_cache(maxsize=512)
+def _camel_to_kebab(key):
+    """Converts a camelCase style key (e.g. 'backgroundColor') to its CSS property name."""
+    return _CAMEL_RE.sub('-', key).lower()
+
+def _z_index_key(comp):
+    """
+    Sort key ordering element components by zIndex. Text nodes have no
+    z-index, and non-numeric values such as 'auto' stack like 0.
+    """
+    if comp.get('type') == 'textnode':
+        return 0
+    try:
+        return int(comp.get('style', {}).get('zIndex', 0))
+    except (TypeError, ValueError):
+        return 0
+
+# Serialized inline styles keyed by the style dict's items. Components created
+# from the same editor template share identical styles, so hits are common.
+_style_cache = {}
+_STYLE_CACHE_LIMIT = 4096
+
+def _style_to_css(style_obj):
+    """Converts a camelCase style object to a CSS string."""
+    if not style_obj:
+        return ""
+    # Item order is part of the key since later declarations can override
+    # earlier shorthands (e.g. 'background' followed by 'backgroundColor').
+    cache_key = tuple(style_obj.items())
+    css = _style_cache.get(cache_key)
+    if css is None:
         css_rules = []
         for key, value in style_obj.items():
-            prop = re.sub(r'(?<!^)(?=[A-Z])', '-', key).lower()
+            prop = _camel_to_kebab(key)
             if value:
                 css_rules.append(f"{prop}: {value};")
-        return " ".join(css_rules)
+        css = " ".join(css_rules)
+        if len(_style_cache) >= _STYLE_CACHE_LIMIT:
+            _style_cache.clear()
+        _style_cache[cache_key] = css
+    return css
 
-    def build_elements_recursive(comps):
-        """
-        Recursively builds HTML elements from the component tree,
-        correctly handling interspersed text nodes.
-        """
-        elements = []
-        # Sort by zIndex for element nodes, text nodes have no z-index
-        sorted_comps = sorted(comps, key=lambda c: int(c.get('style', {}).get('zIndex', 0)) if c.get('type') != 'textnode' else 0)
-        
-        for comp in sorted_comps:
-            # ** FIX: Handle text nodes as plain text content **
-            if comp.get('type') == 'textnode':
-                elements.append(comp.get('text', ''))
-                continue
-
-            # Process normal element components
-            inline_style = style_to_css(comp.get('style', {}))
-            tag = comp.get('tag', 'div')
-            
-            children_html = build_elements_recursive(comp.get('children', []))
-            
-            attributes = f'id="{comp["id"]}" style="{inline_style}"'
-            if comp.get('attributes'):
-                for key, value in comp['attributes'].items():
-                    if key.lower() not in ['style', 'id']:
-                        attr_value = " ".join(value) if isinstance(value, list) else value
-                        attributes += f' {key}="{attr_value}"'
-            
-            if tag in ['img', 'input', 'br', 'hr']: # Self-closing tags
-                 elements.append(f'<{tag} {attributes}>')
-            else:
-                 # ** FIX: No longer adds a separate 'text_content' variable **
-                 elements.append(f'<{tag} {attributes}>{children_html}</{tag}>')
-        
-        return "\n".join(elements)
+def _write_elements(comps, out):
+    """
+    Writes HTML for the component tree to out with an explicit stack,
+    correctly handling interspersed text nodes.
+    """
+    write = out.write
+    # Components still to be opened, interleaved with literal strings
+    # (sibling separators and closing tags), popped in document order.
+    stack = []
+
+    def push_siblings(siblings):
+        # sorted() evaluates the key once per component; single children skip it
+        if len(siblings) > 1:
+            siblings = sorted(siblings, key=_z_index_key)
+        for i in range(len(siblings) - 1, -1, -1):
+            stack.append(siblings[i])
+            if i:
+                stack.append("\n")
+
+    push_siblings(comps)
+    while stack:
+        comp = stack.pop()
+        if isinstance(comp, str):
+            write(comp)
+            continue
+
+        # ** FIX: Handle text nodes as plain text content **
+        if comp.get('type') == 'textnode':
+            write(comp.get('text', ''))
+            continue
+
+        # Process normal element components
+        inline_style = _style_to_css(comp.get('style'))
+        tag = comp.get('tag', 'div')
+
+        attr_parts = [f'id="{escape(comp["id"], quote=True)}"', f'style="{escape(inline_style, quote=True)}"']
+        attrs = comp.get('attributes')
+        if attrs:
+            for key, value in attrs.items():
+                if key.lower() not in _SKIP_ATTRS:
+                    attr_value = " ".join(value) if isinstance(value, list) else str(value)
+                    attr_parts.append(f'{key}="{escape(attr_value, quote=True)}"')
+        attributes = " ".join(attr_parts)
+
+        write(f'<{tag} {attributes}>')
+        if tag not in _SELF_CLOSING:
+            stack.append(f'</{tag}>')
+            children = comp.get('children')
+            if children:
+                push_siblings(children)
+
+def _page_assets(project_data):
+    """Builds the page's (css, script) from the global and per-element code."""
+    global_css = project_data.get('globalCss', '')
+    global_js = project_data.get('globalJs', '')
+    element_css_map = project_data.get('elementCss', {})
+    element_js_map = project_data.get('elementJs', {})
 
-    body_html = build_elements_recursive(components)
-    
     element_specific_css = [
         f"#{comp_id} {{ {css_content} }}" for comp_id, css_content in element_css_map.items() if css_content
     ]
-    full_css = f"{global_css}\n{'\n'.join(element_specific_css)}"
+    full_css = global_css + "\n" + "\n".join(element_specific_css)
 
     element_scripts = [
         f"try{{ const el=document.getElementById('{comp_id}'); if(el){{ (function(el){{ {script} }})(el); }} }}catch(e){{console.error('Error in script for {comp_id}:',e)}}"
         for comp_id, script in element_js_map.items() if script
     ]
     full_script = f"{global_js}\ndocument.addEventListener('DOMContentLoaded',()=>{{{ ''.join(element_scripts) }}});"
+    return full_css, full_script
 
-    html_template = f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Exported Page</title>
-    <style>
-        body {{ margin: 0; padding: 0; font-family: sans-serif; }}
-        {full_css}
-    </style>
-</head>
-<body>
-    {body_html}
-    <script>
-        {full_script}
-    </script>
-</body>
-</html>"""
-    return body_html, html_template
+def write_html(project_data, out):
+    """
+    Streams the complete, runnable HTML page to out (e.g. an open file),
+    writing each element as the component tree is walked instead of
+    building the whole document in memory first.
+    """
+    full_css, full_script = _page_assets(project_data)
+    out.write(_PAGE_HEAD)
+    out.write(full_css)
+    out.write(_PAGE_BODY)
+    _write_elements(project_data.get('components', []), out)
+    out.write(_PAGE_SCRIPT)
+    out.write(full_script)
+    out.write(_PAGE_END)
+
+def generate_html(project_data):
+    """
+    Generates the pieces of the exported page as (body_html, css, script),
+    for callers such as the Lua export that embed them separately. The full
+    page is written by write_html.
+    """
+    full_css, full_script = _page_assets(project_data)
+    body_buf = io.StringIO()
+    _write_elements(project_data.get('components', []), body_buf)
+    return body_buf.getvalue(), full_css, full_script
 
 def generate_lua_script(project_data):
     """
     Generates a runnable Macho API Lua script from the project data.
     """
-    _, full_html = generate_html(project_data)
-    soup = BeautifulSoup(full_html, 'lxml')
-    body_tag = soup.find('body')
-    body_html_str = body_tag.decode_contents(formatter="html") if body_tag else ''
-    style_tag = soup.find('style')
-    css_str = style_tag.string if style_tag else ''
-    script_tag = soup.find('script')
-    js_str = script_tag.string if script_tag else ''
+    body_html_str, css_str, js_str = generate_html(project_data)
+    css_str = _PAGE_BASE_CSS + '\n' + css_str
 
     def sanitize_for_lua_multiline(text_string):
         if not text_string:
@@ -121,10 +205,14 @@ def generate_lua_script(project_data):
         # ** FIX: Check for non-textnode children to determine if it's a submenu **
         has_element_children = any(c.get('type') != 'textnode' for c in comp.get('children', []))
 
+        attributes = comp.get('attributes', {})
+        # One set per component, so each class check is a hash lookup rather than a list scan
+        classes = attributes.get('class', ())
+        classes = set(classes.split() if isinstance(classes, str) else classes)
         lua_type = "action"
-        if 'checkbox' in comp.get('attributes', {}).get('class', []):
+        if 'checkbox' in classes:
             lua_type = "checkbox"
-        if 'slider' in comp.get('attributes', {}).get('class', []):
+        if 'slider' in classes:
             lua_type = "slidercb" if lua_type == "checkbox" else "slider"
         if has_element_children:
             lua_type = "submenu"
@@ -134,51 +222,57 @@ def generate_lua_script(project_data):
         
         if lua_type == "submenu":
             lua_parts.append(f"target = \"{comp['id']}\"")
-        
-        if lua_type != "action" and lua_type != "submenu":
-            lua_parts.append(f"state = Functions.{comp['id'].replace('-', '_')}_state")
-            lua_parts.append(f"action = function(s, v) Functions.{comp['id'].replace('-', '_')}_state, Functions.{comp['id'].replace('-', '_')}_value = s, v end")
-        
-        if lua_type.startswith("slider"):
-            lua_parts.append(f"value = Functions.{comp['id'].replace('-', '_')}_value")
-            lua_parts.append(f"min = {comp.get('attributes', {}).get('data-min', 0)}")
-            lua_parts.append(f"max = {comp.get('attributes', {}).get('data-max', 100)}")
-            lua_parts.append(f"step = {comp.get('attributes', {}).get('data-step', 1)}")
+        elif lua_type != "action":
+            comp_id_lua = comp['id'].replace('-', '_')
+            lua_parts.append(_LUA_STATE_TMPL.format(id=comp_id_lua))
+            if lua_type != "checkbox":
+                lua_parts.append(_LUA_SLIDER_TMPL.format(
+                    id=comp_id_lua,
+                    min=attributes.get('data-min', 0),
+                    max=attributes.get('data-max', 100),
+                    step=attributes.get('data-step', 1),
+                ))
 
         return f"{{ {', '.join(lua_parts)} }}"
 
     lua_menu_structure = ["menuStructure = {"]
     
-    def build_menu_recursive(comps, parent_id="main"):
-        lua_menu_structure.append(f"    {parent_id} = {{")
-        lua_menu_structure.append(f"        title = \"{parent_id.replace('_', ' ').title()}\",")
-        lua_menu_structure.append(f"        items = {{")
-        
-        child_submenus = []
-        for comp in comps:
-            # Only process actual elements, not text nodes, as menu items
-            if comp.get('type') != 'textnode':
-                lua_menu_structure.append(f"            {component_to_lua_table(comp)},")
-                if any(c.get('type') != 'textnode' for c in comp.get('children', [])):
-                    child_submenus.append(comp)
+    def build_menus(comps):
+        # Menus are emitted depth-first, each followed by its submenus in order
+        stack = [(comps, "main")]
+        while stack:
+            menu_comps, parent_id = stack.pop()
+            lua_menu_structure.append(f"    {parent_id} = {{")
+            lua_menu_structure.append(f"        title = \"{parent_id.replace('_', ' ').title()}\",")
+            lua_menu_structure.append(f"        items = {{")
+            
+            child_submenus = []
+            for comp in menu_comps:
+                # Only process actual elements, not text nodes, as menu items
+                if comp.get('type') != 'textnode':
+                    lua_menu_structure.append(f"            {component_to_lua_table(comp)},")
+                    if any(c.get('type') != 'textnode' for c in comp.get('children', [])):
+                        child_submenus.append(comp)
 
-        lua_menu_structure.append("            { text = \"Back\", type = \"back\" },")
-        lua_menu_structure.append("        }")
-        lua_menu_structure.append("    },")
+            lua_menu_structure.append("            { text = \"Back\", type = \"back\" },")
+            lua_menu_structure.append("        }")
+            lua_menu_structure.append("    },")
 
-        for sub in child_submenus:
-            build_menu_recursive(sub['children'], sub['id'])
+            stack.extend((sub['children'], sub['id']) for sub in reversed(child_submenus))
 
-    build_menu_recursive(project_data.get('components', []))
+    build_menus(project_data.get('components', []))
     lua_menu_structure.append("}")
 
     functions_table = ["local Functions = {"]
     def find_all_components(comps):
+        # Pre-order walk with an explicit stack; text nodes are skipped
         all_comps = []
-        for comp in comps:
+        stack = list(reversed(comps))
+        while stack:
+            comp = stack.pop()
             if comp.get('type') != 'textnode':
                 all_comps.append(comp)
-                all_comps.extend(find_all_components(comp.get('children', [])))
+                stack.extend(reversed(comp.get('children', [])))
         return all_comps
 
     for comp in find_all_components(project_data.get('components', [])):